@@ -0,0 +1,299 @@
+import asyncio
+import contextlib
+import os
+import time
+from camoufox.async_api import AsyncNewBrowser
+
+try:
+    import psutil
+except ImportError:
+    psutil = None  # Falls back to /proc on Linux; RSS sampling is disabled elsewhere
+
+MB = 1024 * 1024
+RESTART_BACKOFF = 60  # Seconds without RSS checks after a restart that did not get under the limit
+MAX_RESTART_BACKOFF = 3600
+
+
+def _proc_rss(pid):
+    """Reads the resident set size of a process from /proc, in bytes."""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _proc_descendants(pid):
+    """Lists all descendant PIDs of a process by walking /proc."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces, so split after its closing paren
+        ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    found = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def sample_rss():
+    """Returns (own_rss, browser_rss) in bytes; browser_rss covers every child process."""
+    pid = os.getpid()
+    if psutil is not None:
+        me = psutil.Process(pid)
+        own = me.memory_info().rss
+        browser = 0
+        for child in me.children(recursive=True):
+            try:
+                browser += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return own, browser
+    if os.path.isdir('/proc'):
+        return _proc_rss(pid), sum(_proc_rss(child) for child in _proc_descendants(pid))
+    return 0, 0
+
+
+def merge_cookies(cookies, updates):
+    """Returns `cookies` with every cookie in `updates` added or replaced, matched by name, domain and path."""
+    merged = {(c['name'], c.get('domain'), c.get('path')): c for c in cookies}
+    merged.update({(c['name'], c.get('domain'), c.get('path')): c for c in updates})
+    return list(merged.values())
+
+
+class BrowserSession:
+    """Owns the browser and the one cookie jar every page and API request shares.
+
+    Until the browser is up, API requests go through `startup_request`, a
+    standalone request context; the browser context then starts from its
+    cookies and serves both pages and API requests, so a rotated auth token
+    reaches everything. The browser is restarted when the combined RSS of this
+    process and its children crosses max_rss_mb. Cookies are carried over to
+    the new browser, and the restart waits until no page or API request is
+    using the old one.
+    """
+
+    def __init__(self, playwright, headless, cookies, max_rss_mb=0, startup_request=None):
+        self.playwright = playwright
+        self.headless = headless
+        self.cookies = cookies
+        self.max_rss = max_rss_mb * MB
+        self.startup_request = startup_request
+        self.browser = None
+        self.context = None
+        self.user_agent = None  # The browser's own user agent, sent with API requests once known
+        self.generation = 0
+        self.page_hooks = []  # Async callables run on every new page, e.g. HAR recording
+        self._launch = None
+        self._lock = asyncio.Lock()
+        self._in_use = 0
+        self._idle = asyncio.Event()  # Set while nothing is using the browser
+        self._idle.set()
+        self._resumed = asyncio.Event()  # Cleared while a restart is in progress
+        self._resumed.set()
+        self._backoff = RESTART_BACKOFF
+        self._backoff_until = 0.0
+
+    @property
+    def request(self):
+        """The request context API calls should use right now."""
+        return self.context.request if self.context else self.startup_request
+
+    async def current_cookies(self):
+        """Returns the latest cookies from whichever jar is live."""
+        if self.context:
+            return await self.context.cookies()
+        if self.startup_request and not self.generation:
+            state = await self.startup_request.storage_state()
+            return merge_cookies(self.cookies, state['cookies'])
+        return self.cookies
+
+    async def start(self):
+        """Launches the browser and opens the context all pages and API requests share."""
+        browser = await AsyncNewBrowser(self.playwright, headless=self.headless)
+        self.cookies = await self.current_cookies()  # Picks up cookies set on startup requests meanwhile
+        context = await browser.new_context()
+        await context.add_cookies(self.cookies)
+        page = await context.new_page()
+        self.user_agent = await page.evaluate('navigator.userAgent')
+        await page.close()
+        self.browser, self.context = browser, context
+        self.generation += 1
+
+    async def acquire(self):
+        """Marks the browser as in use, waiting for a restart in progress to finish first."""
+        while not self._resumed.is_set():
+            await self._resumed.wait()
+        self._in_use += 1
+        self._idle.clear()
+
+    def release(self):
+        """Ends a use started with acquire()."""
+        self._in_use -= 1
+        if not self._in_use:
+            self._idle.set()
+
+    @contextlib.asynccontextmanager
+    async def using(self):
+        """Keeps the browser from being restarted for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def wait_until_started(self):
+        """Waits for a background launch to finish."""
+        if self._launch:
+            await self._launch
+
+    def launch_in_background(self):
+        """Starts launching the browser without waiting for it; new_page() waits instead."""
+        self._launch = asyncio.ensure_future(self.start())
+
+    async def close(self):
+        """Closes the browser, cancelling a launch that is still in progress."""
+        if self._launch and not self._launch.done():
+            self._launch.cancel()
+            try:
+                await self._launch
+            except asyncio.CancelledError:
+                print("Browser launch cancelled.")
+        if self.browser:
+            self.context = None
+            await self.browser.close()
+            self.browser = None
+
+    async def new_page(self):
+        """Opens a page in the shared context."""
+        await self.wait_until_started()
+        page = await self.context.new_page()
+        for hook in self.page_hooks:
+            await hook(page)
+        return page
+
+    async def remember_cookies(self):
+        """Keeps the latest cookies so the session survives a browser restart."""
+        try:
+            self.cookies = await self.current_cookies()
+        except Exception as e:
+            print(f"Could not read cookies before restarting: {e}")
+
+    def over_memory_limit(self):
+        """Samples RSS and returns True if this process and the browser are over the limit."""
+        if not self.max_rss or time.monotonic() < self._backoff_until:
+            return False
+        own, browser = sample_rss()
+        if own + browser < self.max_rss:
+            return False
+        print(f"RSS over limit (self: {own // MB} MB, browser: {browser // MB} MB, "
+              f"limit: {self.max_rss // MB} MB).")
+        return True
+
+    async def restart(self, generation):
+        """Restarts the browser unless another worker already did so since `generation`.
+
+        Must not be called while holding acquire(): the restart waits for every
+        current use of the browser to end first.
+        """
+        async with self._lock:
+            if generation != self.generation:
+                return
+            self._resumed.clear()
+            try:
+                if self._in_use:
+                    print(f"Waiting for {self._in_use} in-flight use(s) of the browser before restarting...")
+                await self._idle.wait()
+                print("Restarting browser...")
+                await self.remember_cookies()
+                await self.close()
+                await self.start()
+            finally:
+                self._resumed.set()
+            own, browser = sample_rss()
+            if own + browser >= self.max_rss:
+                # Nothing a restart frees is enough, e.g. this process and the driver alone are over the limit
+                print(f"Still over the RSS limit after restarting (self: {own // MB} MB, browser: {browser // MB} MB); "
+                      f"not checking again for {self._backoff} s.")
+                self._backoff_until = time.monotonic() + self._backoff
+                self._backoff = min(self._backoff * 2, MAX_RESTART_BACKOFF)
+            else:
+                self._backoff = RESTART_BACKOFF
+
+
+class PageRecycler:
+    """Recycles a worker's page after a number of topics or downloaded bytes.
+
+    next_page() holds the browser in use until release() is called, so a
+    restart never closes a page in the middle of a topic.
+    """
+
+    def __init__(self, session, max_topics=0, max_bytes=0):
+        self.session = session
+        self.max_topics = max_topics
+        self.max_bytes = max_bytes
+        self.page = None
+        self.generation = 0
+        self.topics = 0
+        self.bytes = 0
+
+    def _on_response(self, response):
+        length = response.headers.get('content-length')
+        if length and length.isdigit():
+            self.bytes += int(length)
+
+    def _limits_crossed(self):
+        if self.max_topics and self.topics >= self.max_topics:
+            return True
+        return bool(self.max_bytes and self.bytes >= self.max_bytes)
+
+    async def _close_page(self):
+        try:
+            await self.page.close()
+        except Exception as e:
+            print(f"Error closing recycled page: {e}")
+        self.page = None
+
+    async def next_page(self):
+        """Returns a page for the next topic, recycling it first if a limit was crossed."""
+        generation = self.session.generation
+        if self.session.over_memory_limit():
+            await self.session.restart(generation)
+
+        await self.session.acquire()
+        try:
+            if self.page is not None and self.generation != self.session.generation:
+                self.page = None  # The browser was restarted underneath us
+            elif self.page is not None and self._limits_crossed():
+                print(f"Recycling page after {self.topics} topics and {self.bytes // MB} MB.")
+                await self._close_page()
+
+            if self.page is None:
+                self.page = await self.session.new_page()
+                self.page.on('response', self._on_response)
+                self.generation = self.session.generation
+                self.topics = 0
+                self.bytes = 0
+        except BaseException:
+            self.session.release()
+            raise
+
+        self.topics += 1
+        return self.page
+
+    def release(self):
+        """Lets the browser be restarted again once the current topic is done."""
+        self.session.release()
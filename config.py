@@ -0,0 +1,145 @@
+import asyncio
+import copy
+import os
+import signal
+import sys
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'linuxdo.toml')
+
+# Used for anything a profile does not set, and when there is no config file at all.
+DEFAULTS = {
+    'base_url': "https://linux.do",
+    'cookie_file': 'cookies.json',
+    'read_topics_file': 'read_topics.json',
+    'list_cache_file': 'topic_list_cache.json',
+    'topic_cache_file': 'topic_cache.json',
+    'topic_cache_size': 2000,
+    'topic_cache_ttl_hours': 168,
+    'script_dir': '',  # Where the UI looks for scripts and cookie files; empty means next to the UI
+    'lists': {},  # Per-script list paths keyed by script name; each script has its own default
+    'rules': [],  # Skip rules applied to list entries before any topic is opened; see topic_rules.py
+    'queue_size': 8,
+    'write_batch_size': 50,
+    'write_delay_seconds': 2,
+    'recycle_topics': 50,
+    'recycle_mb': 256,
+    'max_rss_mb': 2048,
+    # Everything under limits is re-read on SIGHUP by a running reader
+    'limits': {
+        'discover_concurrency': 2,
+        'report_concurrency': 1,
+        'topic_delay': 5,
+        'navigation_timeout': 60,
+        'request_timeout': 30,
+    },
+}
+
+
+def _merge(base, overlay):
+    merged = copy.deepcopy(base)
+    for key, value in overlay.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_profile(path=None, profile=None):
+    """Loads a named profile from the config file, layered over the built-in defaults.
+
+    The profile defaults to $LINUXDO_PROFILE, then the file's default_profile.
+    Returns (profile_name, settings). A missing default config file, or no TOML
+    parser on Python < 3.11, just yields the defaults; a missing explicit file
+    or profile is an error.
+    """
+    if not os.path.exists(path or CONFIG_FILE):
+        if path or profile:
+            print(f"Config file {path or CONFIG_FILE} not found.")
+            sys.exit(1)
+        return 'default', copy.deepcopy(DEFAULTS)
+    if tomllib is None:
+        print("Reading the config file needs Python 3.11+ or the tomli package: pip install tomli")
+        if path or profile or os.environ.get('LINUXDO_PROFILE'):
+            sys.exit(1)  # A file or profile was asked for explicitly, so defaults would be the wrong settings
+        print(f"Ignoring {CONFIG_FILE} and using the built-in defaults.")
+        return 'default', copy.deepcopy(DEFAULTS)
+    with open(path or CONFIG_FILE, 'rb') as f:
+        data = tomllib.load(f)
+    profile = profile or os.environ.get('LINUXDO_PROFILE') or data.get('default_profile', 'production')
+    profiles = data.get('profiles', {})
+    if profile not in profiles:
+        print(f"Profile '{profile}' not found in {path or CONFIG_FILE}. Available: {', '.join(profiles) or 'none'}")
+        sys.exit(1)
+    return profile, _merge(DEFAULTS, profiles[profile])
+
+
+class Limits:
+    """Runtime limits that a running process re-reads on every use."""
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def update(self, values):
+        """Applies new values in place and returns {name: (old, new)} for those that changed."""
+        changed = {}
+        for key, value in values.items():
+            old = getattr(self, key, None)
+            if old != value:
+                changed[key] = (old, value)
+                setattr(self, key, value)
+        return changed
+
+
+class Config:
+    """Settings of one profile. Only `limits` can change while running, via reload()."""
+
+    def __init__(self, path=None, profile=None, overrides=None):
+        self.path = path
+        self.overrides = overrides or {}  # Command-line values, which win over the file
+        self.profile, settings = load_profile(path, profile)
+        for key, value in self.overrides.items():
+            if key in settings and key != 'limits':
+                settings[key] = value
+        self.settings = settings
+        self.limits = Limits(self._limits_from(settings))
+        print(f"Using config profile '{self.profile}'.")
+
+    def __getattr__(self, name):
+        settings = self.__dict__.get('settings', {})
+        if name in settings:
+            return settings[name]
+        raise AttributeError(name)
+
+    def _limits_from(self, settings):
+        limits = dict(settings['limits'])
+        limits.update({k: v for k, v in self.overrides.items() if k in limits})
+        return limits
+
+    def reload(self):
+        """Re-reads the profile and applies changed runtime limits."""
+        try:
+            _, settings = load_profile(self.path, self.profile)
+        except (OSError, ValueError, SystemExit) as e:
+            print(f"Could not reload config, keeping current limits: {e}")
+            return
+        changed = self.limits.update(self._limits_from(settings))
+        if not changed:
+            print("Config reloaded; no runtime limits changed.")
+        for key, (old, new) in changed.items():
+            print(f"Config reloaded: {key} {old} -> {new}")
+
+    def install_reload_handler(self):
+        """Reloads runtime limits whenever the process receives SIGHUP."""
+        if not hasattr(signal, 'SIGHUP'):
+            print("SIGHUP is not available on this platform; runtime limits cannot be reloaded.")
+            return
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reload)
@@ -0,0 +1,172 @@
+import asyncio
+import base64
+import json
+import re
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Headers that carry the session or CSRF token and must never end up in an archive.
+SECRET_HEADERS = {'cookie', 'set-cookie', 'authorization', 'x-csrf-token'}
+# Headers that no longer describe the body once it has been decoded into the archive.
+STALE_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+TEXT_MIME_HINTS = ('text/', 'json', 'javascript', 'xml', 'svg')
+SECRET_PATTERNS = [
+    (re.compile(r'(<meta name="csrf-token" content=")[^"]*'), r'\1REDACTED'),
+    (re.compile(r'("csrf"\s*:\s*")[^"]*'), r'\1REDACTED'),
+]
+
+
+def normalize_url(url):
+    """Drops the cache-busting `_` query parameter so replayed URLs match recorded ones."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != '_']
+    return urlunsplit(parts._replace(query=urlencode(query), fragment=''))
+
+
+def _headers_to_har(headers):
+    return [{'name': name, 'value': value} for name, value in headers.items()
+            if name.lower() not in SECRET_HEADERS]
+
+
+def _encode_body(body, mime_type):
+    """Returns (text, encoding) for a HAR content block, redacting secrets in text bodies."""
+    if any(hint in mime_type for hint in TEXT_MIME_HINTS):
+        try:
+            text = body.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+        else:
+            for pattern, replacement in SECRET_PATTERNS:
+                text = pattern.sub(replacement, text)
+            return text, None
+    return base64.b64encode(body).decode('ascii'), 'base64'
+
+
+def _decode_body(content):
+    text = content.get('text', '')
+    if content.get('encoding') == 'base64':
+        return base64.b64decode(text)
+    return text.encode('utf-8')
+
+
+class HarRecorder:
+    """Records the HTTP exchanges of every page it is attached to into a HAR file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        self._pending = set()
+
+    async def attach(self, page):
+        """Starts recording responses of a page."""
+        page.on('response', self._on_response)
+
+    def add_exchange(self, method, url, request_headers, post_data, status, response_headers, body, elapsed_ms):
+        """Adds an exchange made outside the browser (e.g. by an HTTP client) to the archive."""
+        mime_type = response_headers.get('content-type', '')
+        text, encoding = _encode_body(body, mime_type)
+        content = {'size': len(body), 'mimeType': mime_type, 'text': text}
+        if encoding:
+            content['encoding'] = encoding
+        request = {
+            'method': method,
+            'url': url,
+            'httpVersion': 'HTTP/1.1',
+            'headers': _headers_to_har(request_headers),
+            'queryString': [{'name': k, 'value': v} for k, v in parse_qsl(urlsplit(url).query)],
+            'cookies': [],
+            'headersSize': -1,
+            'bodySize': len(post_data or b''),
+        }
+        if post_data:
+            post_text, _ = _encode_body(post_data, request_headers.get('content-type', 'text/plain'))
+            request['postData'] = {'mimeType': request_headers.get('content-type', ''), 'text': post_text}
+        self.entries.append({
+            'startedDateTime': datetime.now(timezone.utc).isoformat(),
+            'time': elapsed_ms,
+            'request': request,
+            'response': {
+                'status': status,
+                'statusText': '',
+                'httpVersion': 'HTTP/1.1',
+                'headers': _headers_to_har(response_headers),
+                'cookies': [],
+                'content': content,
+                'redirectURL': response_headers.get('location', ''),
+                'headersSize': -1,
+                'bodySize': len(body),
+            },
+            'cache': {},
+            'timings': {'send': 0, 'wait': elapsed_ms, 'receive': 0},
+        })
+
+    def _on_response(self, response):
+        task = asyncio.ensure_future(self._record(response))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _record(self, response):
+        request = response.request
+        try:
+            await response.finished()
+            body = await response.body()
+        except Exception:
+            body = b''  # Redirects and aborted requests have no body
+        timing = request.timing
+        elapsed_ms = max(timing.get('responseEnd', -1), 0)
+        self.add_exchange(request.method, request.url, await request.all_headers(), request.post_data_buffer,
+                          response.status, await response.all_headers(), body, elapsed_ms)
+
+    async def save(self):
+        """Waits for in-flight recordings and writes the archive."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        har = {'log': {'version': '1.2', 'creator': {'name': 'linux.do.auto', 'version': '1.0'},
+                       'entries': self.entries}}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(har, f)
+        print(f"Recorded {len(self.entries)} HTTP exchanges to {self.path}")
+
+
+class HarReplayer:
+    """Serves recorded exchanges back to pages, aborting anything that was not recorded."""
+
+    def __init__(self, path):
+        self.path = path
+        self.exchanges = defaultdict(deque)
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)['log']['entries']
+        for entry in entries:
+            key = (entry['request']['method'], normalize_url(entry['request']['url']))
+            self.exchanges[key].append(entry['response'])
+        self.misses = 0
+        print(f"Loaded {len(entries)} recorded HTTP exchanges from {path}")
+
+    def lookup(self, method, url):
+        """Returns (status, headers, body) for the next recorded response, or None.
+
+        Responses to the same request are served in recorded order; the last one
+        is repeated once the recording runs out.
+        """
+        queue = self.exchanges.get((method, normalize_url(url)))
+        if not queue:
+            self.misses += 1
+            return None
+        response = queue.popleft() if len(queue) > 1 else queue[0]
+        headers = {h['name']: h['value'] for h in response['headers']
+                   if h['name'].lower() not in STALE_HEADERS}
+        return response['status'], headers, _decode_body(response['content'])
+
+    async def attach(self, page):
+        """Routes every request of a page to the archive."""
+        await page.route('**/*', self._handle_route)
+
+    async def _handle_route(self, route):
+        request = route.request
+        recorded = self.lookup(request.method, request.url)
+        if recorded is None:
+            await route.abort('internetdisconnected')
+            return
+        status, headers, body = recorded
+        await route.fulfill(status=status, headers=headers, body=body)
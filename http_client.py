@@ -0,0 +1,132 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlencode
+import progress
+
+RATE_LIMIT_RETRIES = 3
+DEFAULT_RETRY_AFTER = 10
+
+
+class SessionExpired(Exception):
+    """Raised when the forum rejects the session cookies."""
+
+
+class RequestBlocked(Exception):
+    """Raised on a 403 that did not come from Discourse, e.g. a Cloudflare challenge."""
+
+
+def session_rejected(status, body):
+    """Tells a Discourse "not logged in" response apart from a block in front of the forum."""
+    if status == 401:
+        return True
+    if status != 403:
+        return False
+    try:
+        error_type = json.loads(body).get('error_type')
+    except (ValueError, AttributeError):
+        return False  # Not Discourse's JSON, so not Discourse's verdict on the session
+    return error_type in ('not_logged_in', 'invalid_access')
+
+
+class ApiClient:
+    """Makes JSON requests to the forum through the browser session's request context.
+
+    Requests share the session's cookie jar and carry the browser's user agent
+    once it is known. Exchanges are written to a HarRecorder when recording,
+    and served from a HarReplayer instead of the network when replaying.
+    """
+
+    def __init__(self, session, base_url, recorder=None, replayer=None, limits=None):
+        self.session = session
+        self.base_url = base_url
+        self.limits = limits  # Reloadable config limits; request_timeout is read on every call
+        self.recorder = recorder
+        self.replayer = replayer
+        self.rate_limited = False
+        self._csrf = None
+
+    async def get(self, path, headers=None, timeout=None):
+        """Sends a GET request and returns (status, headers, body)."""
+        return await self._send('GET', path, headers, None, timeout)
+
+    async def post(self, path, form, headers=None, timeout=None):
+        """Sends a form POST with the session's CSRF token and returns (status, headers, body)."""
+        for attempt in range(2):
+            csrf_headers = {'X-CSRF-Token': await self.csrf_token(refresh=attempt > 0),
+                            'X-Requested-With': 'XMLHttpRequest', **(headers or {})}
+            status, response_headers, body = await self._send('POST', path, csrf_headers, form, timeout)
+            if status != 403 or b'BAD CSRF' not in body:
+                break
+            print("CSRF token rejected. Fetching a new one...")
+        return status, response_headers, body
+
+    async def csrf_token(self, refresh=False):
+        """Returns the session's CSRF token, fetched once from /session/csrf.json."""
+        if self._csrf is None or refresh:
+            status, _, body = await self.get('/session/csrf.json')
+            if status != 200:
+                raise RuntimeError(f"Fetching a CSRF token failed with HTTP {status}")
+            self._csrf = json.loads(body)['csrf']
+        return self._csrf
+
+    async def _send(self, method, path, headers, form, timeout):
+        if timeout is None:
+            timeout = self.limits.request_timeout * 1000 if self.limits else 30000
+        url = f"{self.base_url}{path}" if path.startswith('/') else path
+        headers = {'Accept': 'application/json', **(headers or {})}
+        if self.session.user_agent:
+            headers.setdefault('User-Agent', self.session.user_agent)
+        if self.replayer:
+            recorded = self.replayer.lookup(method, url)
+            if recorded is None:
+                raise ConnectionError(f"No recorded response for {method} {url}")
+            return recorded
+
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            started = time.monotonic()
+            async with self.session.using():  # The response must be read before a browser restart disposes of it
+                response = await self.session.request.fetch(url, method=method, headers=headers, form=form, timeout=timeout)
+                body = await response.body()
+            if self.recorder:
+                elapsed_ms = (time.monotonic() - started) * 1000
+                post_data = urlencode(form).encode('utf-8') if form else None
+                request_headers = {**headers, 'content-type': 'application/x-www-form-urlencoded'} if form else headers
+                self.recorder.add_exchange(method, url, request_headers, post_data, response.status,
+                                           response.headers, body, elapsed_ms)
+            if response.status != 429 or attempt == RATE_LIMIT_RETRIES:
+                break
+            retry_after = response.headers.get('retry-after', '')
+            delay = int(retry_after) if retry_after.isdigit() else DEFAULT_RETRY_AFTER
+            print(f"Rate limited on {url}. Retrying in {delay}s...")
+            self.note_status(429, retry_after=delay)
+            await asyncio.sleep(delay)
+
+        self.note_status(response.status)
+        return response.status, response.headers, body
+
+    def note_status(self, status, retry_after=None):
+        """Tracks whether the forum is rate limiting us, emitting a progress event for each change.
+
+        Requests made outside this client, such as the page's timings request,
+        report their status here too so the limited state is always cleared.
+        """
+        if status == 429:
+            if not self.rate_limited or retry_after is not None:
+                progress.emit('rate_limit', limited=True, retry_after=retry_after)
+            self.rate_limited = True
+        elif self.rate_limited:
+            self.rate_limited = False
+            progress.emit('rate_limit', limited=False)
+
+
+async def validate_session(client):
+    """Checks that the session cookies are still logged in and returns the username."""
+    status, _, body = await client.get('/session/current.json')
+    if status == 404 or session_rejected(status, body):  # Discourse answers 404 here when logged out
+        raise SessionExpired(f"/session/current.json returned HTTP {status}")
+    if status == 403:
+        raise RequestBlocked("/session/current.json returned HTTP 403")
+    if status != 200:
+        raise RuntimeError(f"Checking the session failed with HTTP {status}")
+    return json.loads(body)['current_user']['username']
@@ -2,20 +2,34 @@ import sys
 import subprocess
 import os
 import glob
+import time
+from collections import Counter, deque
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout,
-    QTextEdit, QCheckBox, QTabWidget, QLabel, QMessageBox, QComboBox, QLineEdit, QInputDialog
+    QApplication, QWidget, QPushButton, QVBoxLayout, QHBoxLayout, QFormLayout,
+    QTextEdit, QCheckBox, QTabWidget, QLabel, QMessageBox, QComboBox, QLineEdit, QInputDialog,
+    QProgressBar
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+import progress
+from config import Config
 
 # --- CONFIGURATION ---
-READ_SCRIPT_PATH = "E:/linux.do.auto/read_linuxdo.py"
-LOGIN_SCRIPT_PATH = "E:/linux.do.auto/login_linuxdo.py"
-SCRIPT_DIR = "E:/linux.do.auto/"
+# Paths come from linuxdo.toml (profile chosen by $LINUXDO_PROFILE); script_dir defaults to this file's directory.
+CONFIG = Config()
+SCRIPT_DIR = CONFIG.script_dir or os.path.dirname(os.path.abspath(__file__))
+READ_SCRIPT_PATH = os.path.join(SCRIPT_DIR, "read_linuxdo.py")
+LOGIN_SCRIPT_PATH = os.path.join(SCRIPT_DIR, "login_linuxdo.py")
+# JSON files the scripts write that are not cookie files
+NON_COOKIE_FILES = {os.path.basename(CONFIG.read_topics_file), os.path.basename(CONFIG.list_cache_file),
+                    os.path.basename(CONFIG.topic_cache_file)}
+DASHBOARD_FPS = 4
+STALL_SECONDS = 60 # No progress event for this long means the run looks stalled
+RATE_WINDOW_SECONDS = 300 # Topics per minute is averaged over this window
 # --- END CONFIGURATION ---
 
 class Worker(QThread):
     output_signal = pyqtSignal(str)
+    progress_signal = pyqtSignal(dict)
     finished_signal = pyqtSignal()
 
     def __init__(self, script_path, args=None):
@@ -37,7 +51,11 @@ class Worker(QThread):
             )
 
             for line in iter(process.stdout.readline, ''):
-                self.output_signal.emit(line)
+                event = progress.parse(line)
+                if event is not None:
+                    self.progress_signal.emit(event)
+                else:
+                    self.output_signal.emit(line)
             for line in iter(process.stderr.readline, ''):
                 self.output_signal.emit(line)
 
@@ -47,6 +65,133 @@ class Worker(QThread):
         finally:
             self.finished_signal.emit()
 
+class DashboardTab(QWidget):
+    """Shows live progress of a read run from the reader's structured progress events."""
+
+    def __init__(self):
+        super().__init__()
+        self.initUI()
+        self.reset()
+        # Redraw at a fixed frame rate instead of once per event
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(1000 // DASHBOARD_FPS)
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat("%v / %m topics")
+        layout.addWidget(self.progress_bar)
+
+        form = QFormLayout()
+        self.status_label = QLabel()
+        self.done_label = QLabel()
+        self.rate_label = QLabel()
+        self.latency_label = QLabel()
+        self.eta_label = QLabel()
+        self.rate_limit_label = QLabel()
+        self.errors_label = QLabel()
+        self.errors_label.setWordWrap(True)
+        form.addRow("Status:", self.status_label)
+        form.addRow("Topics:", self.done_label)
+        form.addRow("Throughput:", self.rate_label)
+        form.addRow("p95 latency:", self.latency_label)
+        form.addRow("ETA:", self.eta_label)
+        form.addRow("Rate limit:", self.rate_limit_label)
+        form.addRow("Errors:", self.errors_label)
+        layout.addLayout(form)
+        layout.addStretch(1)
+        self.setLayout(layout)
+
+    def reset(self):
+        self.running = False
+        self.started_at = None
+        self.last_event_at = None
+        self.total = 0
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.latencies = []
+        self.done_times = deque()
+        self.errors = Counter()
+        self.rate_limited = False
+        self.retry_after = None
+
+    def handle_event(self, event):
+        now = time.monotonic()
+        kind = event.get('event')
+        self.last_event_at = now
+        if kind == 'run_started':
+            self.reset()
+            self.running = True
+            self.started_at = now
+            self.last_event_at = now
+        elif kind == 'run_finished':
+            self.running = False
+        elif kind == 'topic_queued':
+            self.total += 1
+        elif kind == 'topic_done':
+            self.done += 1
+            self.done_times.append(now)
+            self.latencies.append(event.get('seconds', 0))
+        elif kind == 'topic_skipped':
+            self.skipped += 1
+        elif kind == 'topic_error':
+            self.failed += 1
+            self.errors[f"{event.get('stage')}: {event.get('error')}"] += 1
+        elif kind == 'rate_limit':
+            self.rate_limited = event.get('limited', False)
+            self.retry_after = event.get('retry_after')
+
+    def refresh(self):
+        now = time.monotonic()
+        finished = self.done + self.skipped + self.failed
+        self.progress_bar.setMaximum(max(self.total, 1))
+        self.progress_bar.setValue(min(finished, max(self.total, 1)))
+        self.done_label.setText(f"{self.done} read, {self.skipped} skipped, {self.failed} failed of {self.total} found so far")
+
+        while self.done_times and now - self.done_times[0] > RATE_WINDOW_SECONDS:
+            self.done_times.popleft()
+        window = min(now - self.started_at, RATE_WINDOW_SECONDS) if self.started_at else 0
+        per_minute = len(self.done_times) / window * 60 if window > 0 else 0
+        self.rate_label.setText(f"{per_minute:.1f} topics/min")
+
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self.latency_label.setText(f"{p95:.1f}s over {len(ordered)} topics")
+        else:
+            self.latency_label.setText("-")
+
+        remaining = self.total - finished
+        if self.running and per_minute > 0 and remaining > 0:
+            self.eta_label.setText(f"{remaining / per_minute:.1f} min (more topics may still be found)")
+        else:
+            self.eta_label.setText("-")
+
+        if self.rate_limited:
+            retry = f", retrying in {self.retry_after}s" if self.retry_after else ""
+            self.rate_limit_label.setText(f"Throttled{retry}")
+        else:
+            self.rate_limit_label.setText("OK")
+
+        if self.errors:
+            self.errors_label.setText(", ".join(f"{name} x{count}" for name, count in self.errors.most_common()))
+        else:
+            self.errors_label.setText("None")
+
+        if not self.running:
+            self.status_label.setText("Finished" if self.started_at else "Idle")
+        elif now - self.last_event_at > STALL_SECONDS:
+            self.status_label.setText(f"Stalled (no progress for {int(now - self.last_event_at)}s)")
+        elif self.rate_limited:
+            self.status_label.setText("Running (throttled)")
+        else:
+            self.status_label.setText("Running")
+
+    def run_stopped(self):
+        self.running = False
+
 class LinuxDoReaderApp(QWidget):
     def __init__(self):
         super().__init__()
@@ -90,6 +235,10 @@ class LinuxDoReaderApp(QWidget):
         self.script_tab.setLayout(self.script_layout)
         self.tabs.addTab(self.script_tab, "Script Execution")
 
+        # --- Dashboard Tab ---
+        self.dashboard_tab = DashboardTab()
+        self.tabs.addTab(self.dashboard_tab, "Dashboard")
+
         # --- Cookie Management Tab ---
         self.cookie_tab = QWidget()
         self.cookie_layout = QVBoxLayout()
@@ -142,8 +291,8 @@ class LinuxDoReaderApp(QWidget):
     def populate_cookie_files_dropdown(self):
         self.cookie_file_combo.clear()
         json_files = glob.glob(os.path.join(SCRIPT_DIR, "*.json"))
-        # Filter out read_topics.json if it exists
-        json_files = [f for f in json_files if os.path.basename(f) != "read_topics.json"]
+        # Filter out the scripts' own state files
+        json_files = [f for f in json_files if os.path.basename(f) not in NON_COOKIE_FILES]
         
         if not json_files:
             self.cookie_file_combo.addItem("No cookie files found")
@@ -176,16 +325,18 @@ class LinuxDoReaderApp(QWidget):
         if self.headful_checkbox.isChecked():
             args.append("--headful")
         args.extend(["--cookie-file", selected_cookie_file])
+        args.append("--progress-events")
 
         self.read_worker = Worker(READ_SCRIPT_PATH, args)
         self.read_worker.output_signal.connect(self.append_output)
+        self.read_worker.progress_signal.connect(self.dashboard_tab.handle_event)
         self.read_worker.finished_signal.connect(self.script_finished)
         self.read_worker.start()
 
     def prompt_and_run_login_script(self):
         text, ok = QInputDialog.getText(self, 'New/Existing Cookie File', 
                                          'Enter filename for cookies (e.g., my_account.json):',
-                                         QLineEdit.Normal, "cookies.json")
+                                         QLineEdit.Normal, os.path.basename(CONFIG.cookie_file))
         if ok and text:
             login_cookie_file = os.path.join(SCRIPT_DIR, text)
             self.run_login_script(login_cookie_file)
@@ -207,6 +358,7 @@ class LinuxDoReaderApp(QWidget):
 
     def script_finished(self):
         self.output_text.append("\nRead script finished.")
+        self.dashboard_tab.run_stopped()
         self.set_all_buttons_enabled(True)
         self.populate_cookie_files_dropdown() # Refresh cookie display after script finishes
 
@@ -220,6 +372,7 @@ class LinuxDoReaderApp(QWidget):
             self.read_worker.terminate()
             self.read_worker.wait() # Wait for the thread to actually terminate
             self.output_text.append("\nRead script forcibly stopped.")
+            self.dashboard_tab.run_stopped()
         elif self.login_worker and self.login_worker.isRunning():
             self.login_worker.terminate()
             self.login_worker.wait() # Wait for the thread to actually terminate
@@ -5,9 +5,12 @@ import sys
 import argparse
 from camoufox.async_api import AsyncNewBrowser
 from playwright.async_api import async_playwright
+from config import Config, DEFAULTS
 
 # --- CONFIGURATION ---
-BASE_URL = "https://linux.do/login"
+# Settings live in linuxdo.toml; main() replaces these with the selected profile's values.
+BASE_URL = DEFAULTS['base_url']
+LOGIN_PATH = "/login"
 # --- END CONFIGURATION ---
 
 async def save_cookies(page, filename):
@@ -19,10 +22,11 @@ async def save_cookies(page, filename):
 
 async def login_and_get_cookies(page, cookie_filename):
     """Guides the user to log in manually and saves the cookies."""
+    login_url = f"{BASE_URL}{LOGIN_PATH}"
     try:
-        await page.goto(BASE_URL)
+        await page.goto(login_url)
     except Exception as e:
-        print(f"Error navigating to {BASE_URL}: {e}")
+        print(f"Error navigating to {login_url}: {e}")
         return
 
     print("Please log in manually in the browser window...")
@@ -39,16 +43,23 @@ async def login_and_get_cookies(page, cookie_filename):
 async def main():
     """Main function for login."""
     parser = argparse.ArgumentParser(description="Manual login script for Linux.do.")
-    parser.add_argument("--cookie-file", default="cookies.json", help="Path to save the cookie file.")
+    parser.add_argument("--config", help="Path to the TOML config file (default: linuxdo.toml next to this script).")
+    parser.add_argument("--config-profile", help="Config profile to use (default: the file's default_profile).")
+    parser.add_argument("--cookie-file", help="Path to save the cookie file.")
     args = parser.parse_args()
 
+    overrides = {'cookie_file': args.cookie_file} if args.cookie_file else {}
+    config = Config(args.config, args.config_profile, overrides)
+    global BASE_URL
+    BASE_URL = config.base_url
+
     browser = None
     try:
         async with async_playwright() as p:
             print("Launching browser for you to log in.")
             browser = await AsyncNewBrowser(p, headless=False) # Always run headful for manual login
             page = await browser.new_page()
-            await login_and_get_cookies(page, args.cookie_file)
+            await login_and_get_cookies(page, config.cookie_file)
             print("\nInitial setup complete. You can now run read_linuxdo.py to start reading topics automatically.")
 
     except Exception as e:
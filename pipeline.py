@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+_DONE = object()
+
+
+class Gate:
+    """Limits how many workers run at once. The limit is read from a callable, so it can change at runtime."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self._changed = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._changed:
+            while self.active >= self.limit():
+                try:
+                    # Time out now and then so a raised limit is noticed without a notify
+                    await asyncio.wait_for(self._changed.wait(), 1)
+                except asyncio.TimeoutError:
+                    pass
+            self.active += 1
+
+    async def __aexit__(self, *exc_info):
+        async with self._changed:
+            self.active -= 1
+            self._changed.notify_all()
+
+
+class Stage:
+    """A pipeline stage: `worker` is awaited for each item with up to `concurrency` items in flight.
+
+    `concurrency` is a number or a callable returning the current limit, which
+    may change while running up to `max_workers`. The worker's return value is
+    passed on to the next stage; returning None drops the item. `queue_size`
+    bounds the stage's inbox, so a slow stage makes the stages before it wait
+    instead of piling up work.
+    """
+
+    def __init__(self, name, worker, concurrency=1, queue_size=8, max_workers=None):
+        self.name = name
+        self.worker = worker
+        self.concurrency = concurrency if callable(concurrency) else (lambda: concurrency)
+        self.max_workers = max_workers or self.concurrency()
+        self.queue_size = queue_size
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def summary(self):
+        """Returns a one-line summary of the work this stage did."""
+        return (f"{self.name}: {self.processed} done, {self.errors} failed, "
+                f"{self.busy_seconds:.1f}s busy with up to {self.concurrency()} worker(s)")
+
+
+async def _feed(source, inbox):
+    async for item in source:
+        await inbox.put(item)
+    await inbox.put(_DONE)
+
+
+async def _run_stage(stage, inbox, outbox, on_error):
+    gate = Gate(lambda: max(1, min(stage.concurrency(), stage.max_workers)))
+
+    async def work():
+        while True:
+            async with gate:
+                item = await inbox.get()
+                if item is _DONE:
+                    await inbox.put(_DONE)  # Let the other workers of this stage see it too
+                    return
+                started = time.monotonic()
+                try:
+                    result = await stage.worker(item)
+                except Exception as e:
+                    stage.errors += 1
+                    print(f"[{stage.name}] Error: {e}")
+                    if on_error:
+                        on_error(stage, item, e)
+                    continue
+                finally:
+                    stage.busy_seconds += time.monotonic() - started
+                stage.processed += 1
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    await asyncio.gather(*(work() for _ in range(stage.max_workers)))
+    if outbox is not None:
+        await outbox.put(_DONE)
+
+
+async def run_pipeline(source, stages, on_error=None):
+    """Streams items from an async iterable through stages connected by bounded queues.
+
+    on_error(stage, item, exception) is called for every item a worker fails on.
+    """
+    queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in stages]
+    tasks = [asyncio.ensure_future(_feed(source, queues[0]))]
+    for index, stage in enumerate(stages):
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        tasks.append(asyncio.ensure_future(_run_stage(stage, queues[index], outbox, on_error)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    for stage in stages:
+        print(stage.summary())
@@ -0,0 +1,213 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+
+# Playwright classes whose coroutine methods each cost a round trip to the driver/browser.
+IPC_CLASSES = ('Page', 'Frame', 'ElementHandle', 'JSHandle', 'Locator', 'BrowserContext',
+               'Keyboard', 'Mouse', 'Response', 'Request', 'Route', 'APIRequestContext')
+
+ipc_calls = Counter()
+_topic_calls = contextvars.ContextVar('topic_calls', default=None)
+_topic_traced = contextvars.ContextVar('topic_traced', default=False)
+_ipc_installed = False
+
+
+def _counting(name, func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        ipc_calls[name] += 1
+        calls = _topic_calls.get()
+        if calls is not None:
+            calls[name] += 1
+        return await func(*args, **kwargs)
+    return wrapper
+
+
+def install_ipc_counter():
+    """Wraps Playwright's async methods so every round trip is counted."""
+    global _ipc_installed
+    if _ipc_installed:
+        return
+    import playwright.async_api as api
+    for class_name in IPC_CLASSES:
+        cls = getattr(api, class_name, None)
+        if cls is None:
+            continue
+        for attr, func in list(vars(cls).items()):
+            if not attr.startswith('_') and inspect.iscoroutinefunction(func):
+                setattr(cls, attr, _counting(f"{class_name}.{attr}", func))
+    _ipc_installed = True
+
+
+class StackSampler(threading.Thread):
+    """Samples the main thread's Python stack and aggregates it into folded stacks.
+
+    The output is the "collapsed" format read by flamegraph.pl, speedscope and
+    inferno. Time spent waiting on Playwright IPC or the browser shows up under
+    the event loop's select() frame rather than in Python code.
+    """
+
+    def __init__(self, interval=0.005):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._target = threading.main_thread().ident
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        """Stops sampling and waits for the sampler thread to exit."""
+        self._stop_event.set()
+        self.join()
+
+    def write_folded(self, path):
+        """Writes the collected samples in collapsed-stack format."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    """Profiles a reader run: stack samples, per-topic IPC counts and traces of the slowest topics."""
+
+    def __init__(self, output_dir, slowest_traces=0, interval=0.005):
+        self.output_dir = output_dir
+        self.slowest_traces = slowest_traces
+        self.sampler = StackSampler(interval)
+        self.topics = []
+        self._traces = []  # Min-heap of (seconds, path) for the slowest topics
+        self._traced_contexts = weakref.WeakSet()
+        self._tracing = False  # Pages share one browser context, so only one topic is traced at a time
+        self._started = None
+
+    def start(self):
+        """Starts sampling and counting IPC calls."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        install_ipc_counter()
+        self._started = time.monotonic()
+        self.sampler.start()
+        print(f"Profiling enabled. Output will be written to {self.output_dir}")
+
+    async def topic_started(self, page, topic_url):
+        """Starts counting IPC calls and, if enabled, tracing for one topic."""
+        _topic_calls.set(Counter())
+        _topic_traced.set(False)
+        if not self.slowest_traces or self._tracing:
+            return
+        self._tracing = True
+        try:
+            context = page.context
+            if context not in self._traced_contexts:
+                await context.tracing.start(screenshots=True, snapshots=True)
+                self._traced_contexts.add(context)
+            await context.tracing.start_chunk(title=topic_url)
+        except BaseException:
+            self._tracing = False
+            raise
+        _topic_traced.set(True)
+
+    async def topic_finished(self, page, topic_url, seconds):
+        """Records the topic's timing and IPC calls; keeps its trace if among the slowest."""
+        calls = _topic_calls.get() or Counter()
+        _topic_calls.set(None)
+        total = sum(calls.values())
+        breakdown = ', '.join(f"{name}: {count}" for name, count in calls.most_common(5))
+        print(f"Topic took {seconds:.2f}s with {total} IPC round trips ({breakdown})")
+        self.topics.append({'topic': topic_url, 'seconds': round(seconds, 3),
+                            'ipc_calls': total, 'ipc_breakdown': dict(calls)})
+
+        if not _topic_traced.get():
+            return
+        self._tracing = False
+        _topic_traced.set(False)
+        tracing = page.context.tracing
+        if len(self._traces) < self.slowest_traces or seconds > self._traces[0][0]:
+            name = re.sub(r'[^A-Za-z0-9]+', '_', topic_url).strip('_')
+            path = os.path.join(self.output_dir, f"trace-{name}.zip")
+            await tracing.stop_chunk(path=path)
+            heapq.heappush(self._traces, (seconds, path))
+            if len(self._traces) > self.slowest_traces:
+                _, evicted = heapq.heappop(self._traces)
+                if os.path.exists(evicted):
+                    os.remove(evicted)
+        else:
+            await tracing.stop_chunk()
+
+    def stop(self):
+        """Stops sampling and writes the flamegraph input and IPC summary."""
+        self.sampler.stop()
+        folded_path = os.path.join(self.output_dir, 'stacks.folded')
+        self.sampler.write_folded(folded_path)
+        summary = {
+            'wall_seconds': round(time.monotonic() - self._started, 3),
+            'samples': self.sampler.samples,
+            'ipc_calls': dict(ipc_calls.most_common()),
+            'topics': sorted(self.topics, key=lambda t: t['seconds'], reverse=True),
+            'traces': [path for _, path in sorted(self._traces, reverse=True)],
+        }
+        summary_path = os.path.join(self.output_dir, 'profile_summary.json')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Wrote {self.sampler.samples} stack samples to {folded_path} (render with flamegraph.pl or speedscope).")
+        print(f"Wrote IPC and per-topic timing summary to {summary_path}")
+
+
+class LoopStallMonitor:
+    """Measures how long the asyncio event loop is blocked by synchronous work.
+
+    A task sleeps for `interval` and records how late it wakes up; lateness above
+    `threshold` counts as a stall.
+    """
+
+    def __init__(self, interval=0.05, threshold=0.02):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls = 0
+        self.total_stall = 0.0
+        self.max_stall = 0.0
+        self._task = None
+
+    def start(self):
+        """Starts monitoring on the running loop."""
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - expected
+            if lag > self.threshold:
+                self.stalls += 1
+                self.total_stall += lag
+                self.max_stall = max(self.max_stall, lag)
+
+    def stop(self):
+        """Stops monitoring and prints the stall summary."""
+        if self._task:
+            self._task.cancel()
+        print(f"Event loop stalls: {self.stalls} over {self.threshold * 1000:.0f} ms, "
+              f"{self.total_stall * 1000:.0f} ms in total, longest {self.max_stall * 1000:.0f} ms.")
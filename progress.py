@@ -0,0 +1,32 @@
+import json
+import time
+
+# Lines starting with this prefix carry a JSON progress event instead of log text.
+PROGRESS_PREFIX = '@@progress '
+
+_enabled = False
+
+
+def enable():
+    """Turns on structured progress events on stdout."""
+    global _enabled
+    _enabled = True
+
+
+def emit(event, **fields):
+    """Prints a structured progress event for the UI dashboard, if enabled."""
+    if not _enabled:
+        return
+    fields['event'] = event
+    fields['time'] = time.time()
+    print(PROGRESS_PREFIX + json.dumps(fields), flush=True)
+
+
+def parse(line):
+    """Returns the event dict of a progress line, or None for ordinary output."""
+    if not line.startswith(PROGRESS_PREFIX):
+        return None
+    try:
+        return json.loads(line[len(PROGRESS_PREFIX):])
+    except json.JSONDecodeError:
+        return None
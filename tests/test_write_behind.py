@@ -0,0 +1,38 @@
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from write_behind import WriteBehind
+
+
+def test_single_submit_is_written_after_max_delay(tmp_path):
+    path = tmp_path / 'state.json'
+    writer = WriteBehind(max_batch=50, max_delay=0.2)
+    writer.start()
+    try:
+        writer.submit(str(path), ['topic'])
+        deadline = time.monotonic() + 5
+        while not path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert json.loads(path.read_text()) == ['topic']
+        assert writer.flushes == 1
+    finally:
+        writer.close()
+
+
+def test_full_batch_is_written_before_max_delay(tmp_path):
+    path = tmp_path / 'state.json'
+    writer = WriteBehind(max_batch=3, max_delay=60)
+    writer.start()
+    try:
+        for i in range(3):
+            writer.submit(str(path), [i])
+        deadline = time.monotonic() + 5
+        while not path.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert json.loads(path.read_text()) == [2]
+    finally:
+        writer.close()
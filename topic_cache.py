@@ -0,0 +1,58 @@
+import json
+import os
+import time
+from collections import OrderedDict
+
+# List fields that must match the cached entry for its post stream to still be valid.
+MATCH_FIELDS = ('highest_post_number', 'posts_count', 'last_posted_at')
+
+
+class TopicCache:
+    """Bounded on-disk cache of topic metadata and post numbers, with LRU eviction and a TTL."""
+
+    def __init__(self, filename, max_entries=2000, ttl_seconds=7 * 24 * 3600):
+        self.filename = filename
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()  # Least recently used first
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Loads cached entries from disk."""
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'r') as f:
+            try:
+                entries = json.load(f)
+            except json.JSONDecodeError:
+                return
+        self.entries = OrderedDict((key, entry) for key, entry in entries)
+
+    def snapshot(self):
+        """Returns the cache contents in the on-disk format, least recently used first, for saving."""
+        return list(self.entries.items())
+
+    def get(self, topic_id, metadata):
+        """Returns the cached entry for a topic if it is fresh and matches the list metadata."""
+        key = str(topic_id)
+        entry = self.entries.get(key)
+        if entry is not None and time.time() - entry['cached_at'] > self.ttl_seconds:
+            del self.entries[key]
+            entry = None
+        if entry is None or any(entry.get(field) != metadata.get(field) for field in MATCH_FIELDS):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, topic_id, topic):
+        """Stores a topic's metadata and post numbers, evicting the least recently used entries."""
+        key = str(topic_id)
+        self.entries[key] = {field: topic.get(field) for field in MATCH_FIELDS + ('post_numbers',)}
+        self.entries[key]['cached_at'] = time.time()
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
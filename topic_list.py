@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import re
+from http_client import SessionExpired, RequestBlocked, session_rejected
+
+
+def list_json_path(list_path):
+    """Turns a list page path such as /unseen?page=1 into its JSON endpoint."""
+    path, sep, query = list_path.partition('?')
+    if not path.endswith('.json'):
+        path += '.json'
+    return f"{path}{sep}{query}"
+
+
+def topic_url(topic):
+    """Builds the relative URL of a topic from its list entry."""
+    return f"/t/{topic['slug']}/{topic['id']}"
+
+
+def topic_id_from_url(url):
+    """Extracts the topic id from a relative or absolute topic URL, whatever its slug, or returns None."""
+    match = re.search(r'/t/(?:[^/?#]+/)?(\d+)(?:[/?#]|$)', url)
+    return match.group(1) if match else None
+
+
+def fingerprint(topics):
+    """Hashes the ids and bump times of a topic list so changes can be detected cheaply."""
+    key = json.dumps([[t['id'], t.get('bumped_at')] for t in topics])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def load_list_cache(filename):
+    """Loads cached topic lists and their validators."""
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r') as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+
+async def fetch_topic_list(client, list_path, cache_file, cache_key=None):
+    """Fetches the first page of a topic list, conditionally where the server allows it.
+
+    Returns (topics, unchanged, entry). A 304 response, or a list whose topic ids
+    and bump times match the last committed fetch, is reported as unchanged.
+    Pass entry to commit_topic_list() once the topics have been handled.
+    """
+    cache_key = cache_key or list_path
+    entry = load_list_cache(cache_file).get(cache_key, {})
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    status, response_headers, body = await client.get(list_json_path(list_path), headers=headers)
+    if status == 304 and 'topics' in entry:
+        print(f"Topic list {list_path} not modified since last fetch.")
+        return entry['topics'], True, entry
+    if session_rejected(status, body):
+        raise SessionExpired(f"Topic list {list_path} returned HTTP {status}")
+    if status == 403:
+        raise RequestBlocked(f"Topic list {list_path} returned HTTP 403")
+    if status != 200:
+        raise RuntimeError(f"Fetching topic list {list_path} failed with HTTP {status}")
+
+    topic_list = json.loads(body)['topic_list']
+    topics = topic_list.get('topics', [])
+    digest = fingerprint(topics)
+    unchanged = digest == entry.get('fingerprint')
+    if unchanged:
+        print(f"Topic list {list_path} has the same topics and bump times as last fetch.")
+    entry = {
+        'key': cache_key,
+        'etag': response_headers.get('etag'),
+        'last_modified': response_headers.get('last-modified'),
+        'fingerprint': digest,
+        'more_topics_url': topic_list.get('more_topics_url'),
+        'topics': topics,
+    }
+    return topics, unchanged, entry
+
+
+def commit_topic_list(cache_file, entry, writer):
+    """Stores a fetched list so the next fetch can be made conditional on it.
+
+    The write goes through the same write-behind writer as the read state, after
+    it, so the list cache never lands on disk ahead of the topics it covers.
+    """
+    cache = load_list_cache(cache_file)
+    cache[entry['key']] = entry
+    writer.submit(cache_file, cache)
+
+
+async def iter_topics(client, topics, more_topics_url, on_error=None):
+    """Yields the topics of a list, fetching further pages only when the consumer asks for them.
+
+    A page that cannot be fetched ends the enumeration early; on_error(url, reason)
+    is called so the caller can tell the list was not read in full.
+    """
+    for topic in topics:
+        yield topic
+    while more_topics_url:
+        try:
+            status, _, body = await client.get(list_json_path(more_topics_url))
+            if status != 200:
+                raise RuntimeError(f"HTTP {status}")
+            topic_list = json.loads(body)['topic_list']
+        except Exception as e:
+            print(f"Fetching topic list page {more_topics_url} failed: {e}. Stopping enumeration.")
+            if on_error:
+                on_error(more_topics_url, e)
+            return
+        for topic in topic_list.get('topics', []):
+            yield topic
+        more_topics_url = topic_list.get('more_topics_url')
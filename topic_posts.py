@@ -0,0 +1,48 @@
+import json
+import random
+
+# Discourse serves at most this many posts per posts.json request.
+POSTS_CHUNK_SIZE = 20
+
+
+async def fetch_topic_posts(client, topic_id):
+    """Fetches a topic's metadata and the post number of every post in its stream.
+
+    Post numbers come straight from /t/{id}.json and /t/{id}/posts.json, so the
+    list is exact even for posts the browser would never render. Returns a dict
+    with highest_post_number, posts_count, last_posted_at and post_numbers.
+    """
+    status, _, body = await client.get(f"/t/{topic_id}.json")
+    if status != 200:
+        raise RuntimeError(f"Fetching topic {topic_id} failed with HTTP {status}")
+    topic = json.loads(body)
+    post_stream = topic['post_stream']
+    numbers = {post['id']: post['post_number'] for post in post_stream.get('posts', [])}
+
+    missing = [post_id for post_id in post_stream.get('stream', []) if post_id not in numbers]
+    for start in range(0, len(missing), POSTS_CHUNK_SIZE):
+        query = '&'.join(f"post_ids[]={post_id}" for post_id in missing[start:start + POSTS_CHUNK_SIZE])
+        status, _, body = await client.get(f"/t/{topic_id}/posts.json?{query}")
+        if status != 200:
+            raise RuntimeError(f"Fetching posts of topic {topic_id} failed with HTTP {status}")
+        for post in json.loads(body)['post_stream']['posts']:
+            numbers[post['id']] = post['post_number']
+
+    return {
+        'highest_post_number': topic.get('highest_post_number'),
+        'posts_count': topic.get('posts_count'),
+        'last_posted_at': topic.get('last_posted_at'),
+        'post_numbers': sorted(numbers.values()),
+    }
+
+
+async def post_timings(client, topic_id, post_numbers):
+    """Reports every post of a topic as read through the API and returns the HTTP status.
+
+    Each post gets the same 2-3 s random reading time the page script reports.
+    """
+    timings = {number: random.randint(2000, 2999) for number in post_numbers}
+    form = {'topic_id': str(topic_id), 'topic_time': str(sum(timings.values()))}
+    form.update({f"timings[{number}]": str(ms) for number, ms in timings.items()})
+    status, _, _ = await client.post(f"/t/{topic_id}/timings", form)
+    return status
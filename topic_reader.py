@@ -0,0 +1,383 @@
+import asyncio
+import json
+import os
+import sys
+import argparse
+import signal
+import time
+from playwright.async_api import async_playwright
+from browser_session import BrowserSession, PageRecycler, MB
+from har_archive import HarRecorder, HarReplayer
+from profiling import RunProfiler, LoopStallMonitor
+from http_client import ApiClient, SessionExpired, RequestBlocked, validate_session
+from topic_list import fetch_topic_list, commit_topic_list, iter_topics, topic_id_from_url, topic_url as build_topic_url
+from topic_posts import fetch_topic_posts, post_timings
+from pipeline import Stage, run_pipeline
+from topic_cache import TopicCache, MATCH_FIELDS
+from topic_rules import TopicFilter
+from write_behind import WriteBehind
+from config import Config, DEFAULTS
+import progress
+
+# --- CONFIGURATION ---
+# Settings live in linuxdo.toml; main() replaces these with the selected profile's values.
+READ_TOPICS_FILE = DEFAULTS['read_topics_file']
+BASE_URL = DEFAULTS['base_url']
+MAX_STAGE_WORKERS = 8 # Upper bound for concurrency limits raised at runtime
+# --- END CONFIGURATION ---
+
+def load_cookies(filename):
+    """Loads cookies from a file."""
+    if os.path.exists(filename):
+        with open(filename, 'r') as f:
+            cookies = json.load(f)
+        print(f"Cookies loaded from {filename}")
+        return cookies
+    else:
+        print(f"Cookie file {filename} not found.")
+        sys.exit(1) # Exit if cookies are not found
+
+async def save_cookies(session, filename, writer):
+    """Saves the session's latest cookies to a file through the write-behind writer."""
+    try:
+        cookies = await session.current_cookies()
+    except Exception as e:
+        print(f"Could not read cookies to save them: {e}")
+        return
+    writer.submit(filename, cookies, indent=2)
+    print(f"Cookies automatically updated to {filename}")
+
+def load_read_topics():
+    """Loads the list of previously read topic URLs."""
+    if not os.path.exists(READ_TOPICS_FILE):
+        return set()
+    with open(READ_TOPICS_FILE, 'r') as f:
+        try:
+            return set(json.load(f))
+        except json.JSONDecodeError:
+            return set()
+
+def save_read_topic(topic_url, read_topics, writer):
+    """Saves a topic URL as read; the file is written off the event loop, batched with other updates."""
+    read_topics.add(topic_url)
+    writer.submit(READ_TOPICS_FILE, list(read_topics), indent=2)
+
+def install_shutdown_handler(writer):
+    """Flushes pending state and cancels the run on SIGTERM, so cleanup still happens."""
+    task = asyncio.current_task()
+
+    def on_sigterm():
+        print("Received SIGTERM. Flushing state and shutting down...")
+        writer.flush()
+        task.cancel()
+
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, on_sigterm)
+    except NotImplementedError:
+        # Windows event loops have no signal handlers; at least flush before dying
+        signal.signal(signal.SIGTERM, lambda signum, frame: writer.flush())
+
+async def discover_topic(client, listed, cache=None):
+    """Finds the post numbers to report for a listed topic, from the cache when the list shows no change."""
+    topic_url = listed['url']
+    topic_id = listed['topic_id']
+    started = time.monotonic()
+
+    cached = cache.get(topic_id, listed) if cache else None
+    if cached:
+        print(f"Topic {topic_id} unchanged since it was last discovered, using cached post numbers.")
+        topic = dict(cached, from_cache=True)
+    else:
+        # Post numbers come straight from the topic's JSON payloads, so nothing waits on the post stream being rendered
+        topic = await fetch_topic_posts(client, topic_id)
+        if cache:
+            cache.put(topic_id, topic)
+    post_numbers = topic['post_numbers']
+    print(f"Extracted topic_id: {topic_id}, Found {len(post_numbers)} post numbers.")
+    if not post_numbers:
+        print(f"Could not find post numbers (found: 0) for topic {topic_id}.")
+        progress.emit('topic_skipped', topic=topic_url)
+        return None
+    topic.update(url=topic_url, topic_id=topic_id, discover_seconds=time.monotonic() - started)
+    return topic
+
+async def read_topic(page, topic, client, timeout=60000):
+    """Reads a single topic and sends the timings request."""
+    topic_id = topic['topic_id']
+    post_numbers = topic['post_numbers']
+    full_topic_url = f"{BASE_URL}{topic['url']}"
+    print(f"Reading topic: {full_topic_url}")
+    await page.goto(full_topic_url, wait_until='domcontentloaded', timeout=timeout)
+
+    print(f"Preparing to send 'timings' request for {len(post_numbers)} posts...")
+    js_script = f'''async () => {{
+        const topic_id = {topic_id};
+        const post_numbers = {json.dumps(post_numbers)};
+        const timings = {{}};
+        post_numbers.forEach(num => {{
+            timings[num] = Math.floor(Math.random() * 1000) + 2000;
+        }});
+
+        const formData = new FormData();
+        formData.append('topic_id', topic_id);
+        formData.append('topic_time', Object.values(timings).reduce((a, b) => a + b, 0));
+        for (const [key, value] of Object.entries(timings)) {{
+            formData.append(`timings[${{key}}]`, value);
+        }}
+
+        const response = await fetch(`/t/${{topic_id}}/timings`, {{
+            method: 'POST',
+            body: formData,
+            headers: {{
+                'X-CSRF-Token': document.querySelector('meta[name="csrf-token"]').content
+            }}
+        }});
+        return response.status;
+    }}'''
+    status = await page.evaluate(js_script)
+    client.note_status(status)
+    if status != 200:
+        raise RuntimeError(f"Timings request for topic {topic_id} failed with HTTP {status}")
+    print("Timings request sent.")
+    return topic
+
+async def report_timings(client, topic):
+    """Sends the timings request for a topic without opening it."""
+    topic_id = topic['topic_id']
+    print(f"Sending 'timings' request for {len(topic['post_numbers'])} posts of unchanged topic {topic_id} without opening it...")
+    status = await post_timings(client, topic_id, topic['post_numbers'])
+    if status != 200:
+        raise RuntimeError(f"Timings request for topic {topic_id} failed with HTTP {status}")
+    print("Timings request sent.")
+    return topic
+
+async def enumerate_topics(client, list_entry, read_topics, topic_filter=None, on_error=None):
+    """Streams unread topics, with the list metadata discovery needs, as list pages arrive."""
+    # read_topics holds full URLs, possibly with an older slug, so topics are matched by id
+    read_ids = {topic_id_from_url(url) for url in read_topics}
+    async for topic in iter_topics(client, list_entry['topics'], list_entry['more_topics_url'], on_error=on_error):
+        url = build_topic_url(topic)
+        if str(topic['id']) not in read_ids:
+            rule = topic_filter.match(topic) if topic_filter else None
+            if rule:
+                print(f"Skipping topic {url} (rule: {rule.name}).")
+                continue
+            progress.emit('topic_queued', topic=url)
+            listed = {field: topic.get(field) for field in MATCH_FIELDS}
+            listed.update(url=url, topic_id=str(topic['id']))
+            yield listed
+
+async def chain_topics(first, rest):
+    """Yields an already enumerated topic followed by the rest of the stream."""
+    yield first
+    async for topic in rest:
+        yield topic
+
+async def read_backlog(client, recyclers, listed_topics, read_topics, writer, config, cache=None, profiler=None):
+    """Discovers, reports and persists topics in overlapping stages.
+
+    Returns (read, failed): topics persisted as read, and topics some stage failed on.
+    """
+    limits = config.limits
+    pages = asyncio.LifoQueue() # Reuse the most recently used page so idle recyclers never open one
+    for recycler in recyclers:
+        pages.put_nowait(recycler)
+
+    # Time spent queued between stages and in topic_delay is left out of a topic's reported seconds
+    async def report(topic):
+        if topic.get('from_cache'):
+            # The list shows the topic unchanged since it was discovered, so there is nothing new to load
+            started = time.monotonic()
+            try:
+                return await report_timings(client, topic)
+            finally:
+                topic['report_seconds'] = time.monotonic() - started
+                await asyncio.sleep(limits.topic_delay)
+        recycler = await pages.get()
+        working_since = time.monotonic()
+        try:
+            page = await recycler.next_page()
+            try:
+                if profiler:
+                    await profiler.topic_started(page, topic['url'])
+                started = time.monotonic()
+                try:
+                    return await read_topic(page, topic, client, timeout=limits.navigation_timeout * 1000)
+                finally:
+                    topic['report_seconds'] = time.monotonic() - working_since
+                    if profiler:
+                        await profiler.topic_finished(page, topic['url'], time.monotonic() - started)
+            finally:
+                recycler.release()
+                await asyncio.sleep(limits.topic_delay)
+        finally:
+            pages.put_nowait(recycler)
+
+    async def persist(topic):
+        full_topic_url = f"{BASE_URL}{topic['url']}"
+        save_read_topic(full_topic_url, read_topics, writer)
+        print(f"Topic {full_topic_url} marked as read.")
+        progress.emit('topic_done', topic=topic['url'], seconds=topic['discover_seconds'] + topic['report_seconds'])
+
+    def on_error(stage, item, error):
+        progress.emit('topic_error', topic=item['url'], stage=stage.name, error=type(error).__name__)
+
+    stages = [
+        Stage('discover', lambda listed: discover_topic(client, listed, cache), concurrency=lambda: limits.discover_concurrency,
+              queue_size=config.queue_size, max_workers=MAX_STAGE_WORKERS),
+        Stage('report', report, concurrency=lambda: limits.report_concurrency,
+              queue_size=config.queue_size, max_workers=len(recyclers)),
+        Stage('persist', persist, concurrency=1, queue_size=config.queue_size),
+    ]
+    await run_pipeline(listed_topics, stages, on_error=on_error)
+    return stages[-1].processed, sum(stage.errors for stage in stages)
+
+async def main(script_name, default_list_path):
+    """Reads the unread topics of one list; the reader scripts differ only in which list."""
+    parser = argparse.ArgumentParser(description="Automated Linux.do topic reader.")
+    parser.add_argument("--headful", action="store_true", help="Run browser in headful mode (visible UI).")
+    parser.add_argument("--config", help="Path to the TOML config file (default: linuxdo.toml next to this script).")
+    parser.add_argument("--config-profile", help="Config profile to use (default: the file's default_profile).")
+    parser.add_argument("--cookie-file", help="Path to the cookie file.")
+    parser.add_argument("--recycle-topics", type=int, help="Recycle the page after this many topics (0 to disable).")
+    parser.add_argument("--recycle-mb", type=int, help="Recycle the page after downloading this many MB (0 to disable).")
+    parser.add_argument("--max-rss-mb", type=int, help="Restart the browser when this process and the browser use more RSS than this (0 to disable).")
+    parser.add_argument("--record", metavar="HAR_FILE", help="Record HTTP exchanges (secrets stripped) to a HAR archive.")
+    parser.add_argument("--replay", metavar="HAR_FILE", help="Serve HTTP exchanges from a recorded HAR archive instead of the network.")
+    parser.add_argument("--discover-concurrency", type=int, help="Number of topics whose posts are fetched at the same time.")
+    parser.add_argument("--report-concurrency", type=int, help="Number of pages reporting read topics at the same time.")
+    parser.add_argument("--queue-size", type=int, help="Maximum number of topics waiting between two stages.")
+    parser.add_argument("--topic-delay", type=float, help="Seconds each page waits after reporting a topic.")
+    parser.add_argument("--progress-events", action="store_true", help="Print structured progress events for the UI dashboard.")
+    parser.add_argument("--profile", metavar="DIR", help="Sample the run's Python stacks and count Playwright IPC calls per topic; write results to DIR.")
+    parser.add_argument("--profile-traces", type=int, default=0, metavar="N", help="With --profile, keep Playwright traces of the N slowest topics.")
+    args = parser.parse_args()
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be used together.")
+
+    # Command-line values win over the config profile; unset flags are None and fall through
+    overrides = {key: value for key, value in vars(args).items() if value is not None}
+    config = Config(args.config, args.config_profile, overrides)
+    global READ_TOPICS_FILE, BASE_URL
+    READ_TOPICS_FILE = config.read_topics_file
+    BASE_URL = config.base_url
+    list_path = config.lists.get(script_name, default_list_path)
+    topic_filter = TopicFilter(config.rules)
+
+    if args.progress_events:
+        progress.enable()
+    progress.emit('run_started')
+
+    profiler = RunProfiler(args.profile, slowest_traces=args.profile_traces) if args.profile else None
+    if profiler:
+        profiler.start()
+
+    writer = WriteBehind(max_batch=config.write_batch_size, max_delay=config.write_delay_seconds)
+    writer.start()
+    stall_monitor = LoopStallMonitor()
+    stall_monitor.start()
+
+    try:
+        config.install_reload_handler()
+        install_shutdown_handler(writer)
+        async with async_playwright() as p:
+            if args.replay and not os.path.exists(config.cookie_file):
+                cookies = [] # Recorded traffic carries no cookies, so none are needed offline
+            else:
+                cookies = load_cookies(config.cookie_file)
+            # API requests start on a standalone request context; the browser context takes over its cookies once up
+            api_context = await p.request.new_context(storage_state={'cookies': cookies, 'origins': []})
+            session = BrowserSession(p, headless=not args.headful, cookies=cookies, max_rss_mb=config.max_rss_mb,
+                                     startup_request=api_context)
+            recorder = HarRecorder(args.record) if args.record else None
+            if recorder:
+                session.page_hooks.append(recorder.attach)
+            replayer = HarReplayer(args.replay) if args.replay else None
+            if replayer:
+                session.page_hooks.append(replayer.attach)
+            # The browser launches while the session and topic list are checked over plain HTTP;
+            # session.close() cancels the launch if it turns out there is nothing to read.
+            print("Launching browser in the background...")
+            session.launch_in_background()
+            try:
+                client = ApiClient(session, BASE_URL, recorder=recorder, replayer=replayer, limits=config.limits)
+                startup = lambda: asyncio.gather(
+                    validate_session(client),
+                    fetch_topic_list(client, list_path, config.list_cache_file,
+                                     cache_key=f"{os.path.basename(config.cookie_file)}:{list_path}"),
+                )
+                try:
+                    try:
+                        username, (_, unchanged, list_entry) = await startup()
+                    except RequestBlocked as e:
+                        # The standalone context lacks the browser's user agent; its own context usually gets through
+                        print(f"Startup request blocked ({e}). Retrying through the browser...")
+                        await session.wait_until_started()
+                        username, (_, unchanged, list_entry) = await startup()
+                except SessionExpired as e:
+                    print(f"Session rejected: {e}")
+                    print("Cookies might be expired or invalid. Please delete cookies.json and run login_linuxdo.py again to log in.")
+                    sys.exit(1)
+                print(f"Successfully logged in using cookies as {username}.")
+                if unchanged:
+                    print("Topic list unchanged since last run. Nothing to do.")
+                    return
+
+                read_topics = load_read_topics()
+                print(f"Loaded {len(read_topics)} previously read topics.")
+
+                truncated = [] # List pages that could not be fetched
+                listed_topics = enumerate_topics(client, list_entry, read_topics, topic_filter,
+                                                 on_error=lambda url, error: truncated.append(url))
+                try:
+                    first_topic = await listed_topics.__anext__()
+                except StopAsyncIteration:
+                    print("No new topics found.")
+                    if not truncated:
+                        commit_topic_list(config.list_cache_file, list_entry, writer)
+                    return
+
+                # Pages are opened lazily, so spare recyclers only matter if report_concurrency is raised
+                recyclers = [PageRecycler(session, max_topics=config.recycle_topics, max_bytes=config.recycle_mb * MB)
+                             for _ in range(max(config.limits.report_concurrency, MAX_STAGE_WORKERS))]
+                print("Starting to read new topics as the list is enumerated...")
+                cache = TopicCache(config.topic_cache_file, max_entries=config.topic_cache_size,
+                                   ttl_seconds=config.topic_cache_ttl_hours * 3600)
+                try:
+                    read_count, failed_count = await read_backlog(client, recyclers, chain_topics(first_topic, listed_topics),
+                                                                  read_topics, writer, config, cache=cache, profiler=profiler)
+                finally:
+                    writer.submit(cache.filename, cache.snapshot())
+                    print(f"Topic cache: {cache.hits} hits, {cache.misses} misses, {len(cache.entries)} entries.")
+                print(f"Read {read_count} new topics.")
+                # Leave the list uncommitted so the next run does not take it as unchanged and skip the retries
+                if failed_count:
+                    print(f"{failed_count} topics failed; they will be retried on the next run.")
+                if truncated:
+                    print("The topic list was not read to the end; the rest will be read on the next run.")
+                if not failed_count and not truncated:
+                    commit_topic_list(config.list_cache_file, list_entry, writer)
+            finally:
+                # Even idle runs save cookies, since the forum may have rotated the auth token on a startup request
+                if not args.replay:
+                    await save_cookies(session, config.cookie_file, writer)
+                if recorder:
+                    await recorder.save()
+                await session.close()
+                await api_context.dispose()
+
+    except asyncio.CancelledError:
+        print("Run cancelled.")
+    except Exception as e:
+        print(f"An error occurred during execution: {e}")
+        print("Please ensure you have installed camoufox and playwright: pip install -U camoufox[geoip] playwright")
+        print("Also, run 'playwright install' to download browser binaries.")
+    finally:
+        if topic_filter.rules:
+            print(topic_filter.summary())
+        writer.close()
+        stall_monitor.stop()
+        if profiler:
+            profiler.stop()
+        progress.emit('run_finished')
+
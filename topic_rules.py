@@ -0,0 +1,89 @@
+import sys
+import time
+from datetime import datetime
+
+# Conditions a rule may set; a topic is skipped when it meets every condition of any rule.
+RULE_CONDITIONS = ('categories', 'tags', 'min_posts_count', 'max_posts_count',
+                   'older_than_days', 'closed', 'archived')
+
+
+def _timestamp(value):
+    """Parses a Discourse ISO 8601 timestamp into seconds since the epoch."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def _tag_names(topic):
+    # Newer Discourse versions list tags as objects rather than plain names
+    return {tag['name'] if isinstance(tag, dict) else tag for tag in topic.get('tags') or []}
+
+
+class TopicRule:
+    """One skip rule, matched against a topic's list metadata."""
+
+    def __init__(self, spec, index):
+        unknown = set(spec) - set(RULE_CONDITIONS) - {'name'}
+        if unknown:
+            print(f"Unknown condition(s) in topic rule {index + 1}: {', '.join(sorted(unknown))}")
+            sys.exit(1)
+        if not set(spec) & set(RULE_CONDITIONS):
+            print(f"Topic rule {index + 1} has no conditions and would skip every topic.")
+            sys.exit(1)
+        self.name = spec.get('name') or f"rule {index + 1}"
+        self.categories = set(spec['categories']) if 'categories' in spec else None
+        self.tags = set(spec['tags']) if 'tags' in spec else None
+        self.min_posts_count = spec.get('min_posts_count')
+        self.max_posts_count = spec.get('max_posts_count')
+        self.older_than_days = spec.get('older_than_days')
+        self.closed = spec.get('closed')
+        self.archived = spec.get('archived')
+        self.hits = 0
+
+    def matches(self, topic, now):
+        """Returns True if the topic meets every condition of this rule."""
+        if self.categories is not None and topic.get('category_id') not in self.categories:
+            return False
+        if self.tags is not None and not self.tags & _tag_names(topic):
+            return False
+        posts_count = topic.get('posts_count') or 0
+        if self.min_posts_count is not None and posts_count < self.min_posts_count:
+            return False
+        if self.max_posts_count is not None and posts_count > self.max_posts_count:
+            return False
+        if self.older_than_days is not None:
+            created = _timestamp(topic.get('created_at'))
+            if created is None or now - created < self.older_than_days * 86400:
+                return False
+        if self.closed is not None and bool(topic.get('closed')) != self.closed:
+            return False
+        if self.archived is not None and bool(topic.get('archived')) != self.archived:
+            return False
+        return True
+
+
+class TopicFilter:
+    """Skip rules loaded once at startup and applied to list entries before any navigation."""
+
+    def __init__(self, specs):
+        self.rules = [TopicRule(spec, index) for index, spec in enumerate(specs or [])]
+        self.checked = 0
+
+    def match(self, topic):
+        """Returns the first rule that skips the topic, counting the hit, or None to keep it."""
+        self.checked += 1
+        now = time.time()
+        for rule in self.rules:
+            if rule.matches(topic, now):
+                rule.hits += 1
+                return rule
+        return None
+
+    def summary(self):
+        """Returns a one-line summary of how many topics each rule skipped."""
+        hits = ', '.join(f"{rule.name}: {rule.hits}" for rule in self.rules)
+        skipped = sum(rule.hits for rule in self.rules)
+        return f"Topic rules skipped {skipped} of {self.checked} unread topics ({hits})."
@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+import time
+
+
+class WriteBehind(threading.Thread):
+    """Writes JSON state files from a background thread, batching updates into group commits.
+
+    submit() only records the latest data for a file; the thread writes every
+    pending file together once max_batch updates have queued up or max_delay
+    seconds have passed since the first one. close() flushes whatever is left.
+    """
+
+    def __init__(self, max_batch=50, max_delay=2.0):
+        super().__init__(name='write-behind', daemon=True)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pending = {}  # filename -> (data, indent); later updates replace earlier ones
+        self.pending_updates = 0
+        self.first_pending_at = None
+        self.updates = 0
+        self.flushes = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Keeps flushes in order when called from several threads
+        self._wake = threading.Condition(self._lock)
+        self._closing = False
+
+    def submit(self, filename, data, indent=None):
+        """Queues `data` to be written to `filename` as JSON. `data` must not be mutated afterwards."""
+        with self._lock:
+            self.pending[filename] = (data, indent)
+            self.pending_updates += 1
+            self.updates += 1
+            if self.first_pending_at is None:
+                self.first_pending_at = time.monotonic()
+                self._wake.notify()  # Lets the thread start its max_delay timer
+            elif self.pending_updates >= self.max_batch:
+                self._wake.notify()
+
+    def run(self):
+        while True:
+            with self._lock:
+                while not self._closing and not self._due():
+                    timeout = None
+                    if self.first_pending_at is not None:
+                        timeout = max(0, self.first_pending_at + self.max_delay - time.monotonic())
+                    self._wake.wait(timeout)
+                closing = self._closing
+            self.flush()
+            if closing:
+                return
+
+    def _due(self):
+        if self.first_pending_at is None:
+            return False
+        return (self.pending_updates >= self.max_batch
+                or time.monotonic() - self.first_pending_at >= self.max_delay)
+
+    def flush(self):
+        """Writes all pending files now. Safe to call from any thread."""
+        with self._flush_lock:
+            with self._lock:
+                batch = self.pending
+                self.pending = {}
+                self.pending_updates = 0
+                self.first_pending_at = None
+            if not batch:
+                return
+            for filename, (data, indent) in batch.items():
+                # Write to a temporary file first so a crash never leaves a truncated state file
+                tmp_filename = f"{filename}.tmp"
+                try:
+                    with open(tmp_filename, 'w') as f:
+                        json.dump(data, f, indent=indent)
+                    os.replace(tmp_filename, filename)
+                except OSError as e:
+                    print(f"Error writing {filename}: {e}")
+            self.flushes += 1
+
+    def close(self):
+        """Flushes pending writes and stops the thread."""
+        with self._lock:
+            self._closing = True
+            self._wake.notify()
+        if self.is_alive():
+            self.join()
+        else:
+            self.flush()
+        print(f"Write-behind: {self.updates} updates written in {self.flushes} flushes.")